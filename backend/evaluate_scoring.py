@@ -0,0 +1,197 @@
+"""
+Offline evaluation harness for career scoring backends.
+
+Replays recorded UserProfile payloads (one JSON object per line) against a
+candidate scoring function and compares it with the reference
+calculate_match_score: top-K agreement, rank correlation, score deltas and
+throughput.
+
+Usage:
+    python evaluate_scoring.py profiles.jsonl --backend exact
+    python evaluate_scoring.py profiles.jsonl --backend mymodule:my_score --top-k 3 --json
+
+A backend is any callable (profile: UserProfile, career: dict) -> float, given
+either as a built-in name or as "module:function".
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import statistics
+import sys
+import time
+
+# Keep the server's startup messages off stdout so --json output stays parseable
+with contextlib.redirect_stdout(sys.stderr):
+    from server import UserProfile, calculate_match_score, career_catalog
+
+# Minimum score get_recommendations requires before a career is recommended
+RELEVANCE_THRESHOLD = 0.2
+
+
+def exact_match_score(profile: UserProfile, career: dict) -> float:
+    """Reference weights, but skills only match on exact (case-insensitive) equality"""
+    user_skills = {s.lower() for s in profile.skills}
+    score = 0.0
+    max_score = 0.15
+    required = [s.lower() for s in career.get("required_skills", [])]
+    preferred = [s.lower() for s in career.get("preferred_skills", [])]
+    if required:
+        score += 0.5 * sum(1 for s in required if s in user_skills) / len(required)
+        max_score += 0.5
+    if preferred:
+        score += 0.2 * sum(1 for s in preferred if s in user_skills) / len(preferred)
+        max_score += 0.2
+    score += 0.15 * min(profile.experience_years / 5, 1.0)
+    if profile.interests:
+        category = career["category"].lower()
+        if any(i.lower() in category or category in i.lower() for i in profile.interests):
+            score += 0.15
+        max_score += 0.15
+    return min(score / max_score, 1.0)
+
+
+BUILTIN_BACKENDS = {
+    "reference": calculate_match_score,
+    "exact": exact_match_score,
+}
+
+
+def load_backend(name: str):
+    if name in BUILTIN_BACKENDS:
+        return BUILTIN_BACKENDS[name]
+    if ":" not in name:
+        raise SystemExit(f"Unknown backend '{name}'. Use one of {sorted(BUILTIN_BACKENDS)} or module:function")
+    module_name, func_name = name.split(":", 1)
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def load_profiles(path: str) -> list:
+    profiles = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            payload = json.loads(line)
+            # Accept bare profiles or records wrapping them as {"profile": {...}}
+            payload = payload.get("profile", payload)
+            try:
+                profiles.append(UserProfile(**payload))
+            except Exception as e:
+                print(f"⚠️ Skipping line {line_number}: {e}", file=sys.stderr)
+    return profiles
+
+
+def load_catalog(path: str = None) -> list:
+    if path is None:
+        return career_catalog.all()
+    with open(path) as f:
+        return json.load(f)
+
+
+def score_all(backend, profiles: list, careers: list):
+    """Score every profile against every career, returning the scores and elapsed seconds"""
+    started = time.perf_counter()
+    scores = [[backend(profile, career) for career in careers] for profile in profiles]
+    return scores, time.perf_counter() - started
+
+
+def top_k(scores: list, k: int) -> list:
+    ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+    return [i for i in ranked if scores[i] > RELEVANCE_THRESHOLD][:k]
+
+
+def average_ranks(values: list) -> list:
+    order = sorted(range(len(values)), key=lambda i: values[i])
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for position in range(i, j + 1):
+            ranks[order[position]] = (i + j) / 2 + 1
+        i = j + 1
+    return ranks
+
+
+def spearman(a: list, b: list) -> float:
+    """Spearman rank correlation with tie-averaged ranks; 1.0 when either side is constant"""
+    ra, rb = average_ranks(a), average_ranks(b)
+    mean_a, mean_b = statistics.fmean(ra), statistics.fmean(rb)
+    cov = sum((x - mean_a) * (y - mean_b) for x, y in zip(ra, rb))
+    var_a = sum((x - mean_a) ** 2 for x in ra)
+    var_b = sum((y - mean_b) ** 2 for y in rb)
+    if var_a == 0 or var_b == 0:
+        return 1.0 if var_a == var_b else 0.0
+    return cov / (var_a * var_b) ** 0.5
+
+
+def evaluate(candidate, profiles: list, careers: list, k: int, repeat: int = 1) -> dict:
+    reference_scores, reference_time = score_all(calculate_match_score, profiles, careers)
+    candidate_scores, candidate_time = score_all(candidate, profiles, careers)
+    for _ in range(repeat - 1):
+        reference_time = min(reference_time, score_all(calculate_match_score, profiles, careers)[1])
+        candidate_time = min(candidate_time, score_all(candidate, profiles, careers)[1])
+
+    agreements, exact_top_k, correlations, deltas = [], 0, [], []
+    for ref, cand in zip(reference_scores, candidate_scores):
+        ref_top, cand_top = top_k(ref, k), top_k(cand, k)
+        if ref_top or cand_top:
+            agreements.append(len(set(ref_top) & set(cand_top)) / max(len(ref_top), len(cand_top)))
+        else:
+            agreements.append(1.0)
+        exact_top_k += ref_top == cand_top
+        correlations.append(spearman(ref, cand))
+        deltas.extend(abs(x - y) for x, y in zip(ref, cand))
+
+    pairs = len(profiles) * len(careers)
+    return {
+        "profiles": len(profiles),
+        "careers": len(careers),
+        "top_k": k,
+        "top_k_agreement": statistics.fmean(agreements),
+        "top_k_exact_order": exact_top_k / len(profiles),
+        "spearman_mean": statistics.fmean(correlations),
+        "spearman_min": min(correlations),
+        "score_delta_mean": statistics.fmean(deltas),
+        "score_delta_max": max(deltas),
+        "reference_pairs_per_second": pairs / reference_time if reference_time else float("inf"),
+        "candidate_pairs_per_second": pairs / candidate_time if candidate_time else float("inf"),
+        "speedup": reference_time / candidate_time if candidate_time else float("inf"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare a scoring backend with calculate_match_score")
+    parser.add_argument("profiles", help="JSONL file of recorded UserProfile payloads")
+    parser.add_argument("--backend", default="reference", help="built-in name or module:function")
+    parser.add_argument("--catalog", help="JSON file with a list of careers (defaults to the built-in catalog)")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3, help="timing repetitions; the fastest run is reported")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    profiles = load_profiles(args.profiles)
+    if not profiles:
+        raise SystemExit("No profiles to evaluate")
+    careers = load_catalog(args.catalog)
+    report = evaluate(load_backend(args.backend), profiles, careers, args.top_k, max(args.repeat, 1))
+    report["backend"] = args.backend
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"Backend: {args.backend}  ({report['profiles']} profiles x {report['careers']} careers)")
+    print(f"Top-{args.top_k} agreement:     {report['top_k_agreement']:.1%}")
+    print(f"Top-{args.top_k} exact order:   {report['top_k_exact_order']:.1%}")
+    print(f"Spearman (mean/min):  {report['spearman_mean']:.3f} / {report['spearman_min']:.3f}")
+    print(f"Score delta (mean/max): {report['score_delta_mean']:.4f} / {report['score_delta_max']:.4f}")
+    print(f"Throughput reference: {report['reference_pairs_per_second']:,.0f} pairs/s")
+    print(f"Throughput candidate: {report['candidate_pairs_per_second']:,.0f} pairs/s ({report['speedup']:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,26 @@ FastAPI Backend for AI Career Path Recommender
 Uses OpenAI GPT-4o-mini via Emergent LLM for AI recommendations
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import motor.motor_asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+import asyncio
+import contextvars
+import hashlib
+import hmac
+import json
+import random
+import re
+import sys
+import threading
+import time
+import uuid
 import os
 from dotenv import load_dotenv
 # OpenAI will be imported in the function if needed
@@ -49,6 +63,294 @@ except Exception as e:
 
 # OpenAI configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+LLM_MODEL = "gpt-3.5-turbo"  # Using ChatGPT model
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "10"))
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "40000"))
+LLM_MAX_QUEUE_WAIT_SECONDS = float(os.getenv("LLM_MAX_QUEUE_WAIT_SECONDS", "1"))
+LLM_LATENCY_THRESHOLD_SECONDS = float(os.getenv("LLM_LATENCY_THRESHOLD_SECONDS", "5"))
+LLM_ERROR_RATE_THRESHOLD = float(os.getenv("LLM_ERROR_RATE_THRESHOLD", "0.5"))
+LLM_DEGRADED_COOLDOWN_SECONDS = float(os.getenv("LLM_DEGRADED_COOLDOWN_SECONDS", "30"))
+LLM_BATCH_REASONING = os.getenv("LLM_BATCH_REASONING", "true").lower() == "true"
+TOP_K_RECOMMENDATIONS = 3
+
+# Background job and roadmap cache configuration
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "memory")  # "memory" or "mongo"
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_RETRIES = int(os.getenv("JOB_MAX_RETRIES", "2"))
+JOB_HISTORY_SECONDS = float(os.getenv("JOB_HISTORY_SECONDS", "86400"))  # finished jobs kept in MongoDB
+JOB_QUEUE_ERROR_BACKOFF_SECONDS = 5.0
+ROADMAP_CACHE_TTL_SECONDS = float(os.getenv("ROADMAP_CACHE_TTL_SECONDS", "86400"))
+roadmap_cache = {}  # career_id -> (expires_at, roadmap)
+
+RECOMMENDATION_CACHE_SIZE = int(os.getenv("RECOMMENDATION_CACHE_SIZE", "512"))
+RECOMMENDATION_CACHE_TTL_SECONDS = float(os.getenv("RECOMMENDATION_CACHE_TTL_SECONDS", "600"))
+
+# Append every /recommendations profile to this JSONL file for offline evaluation
+RECORD_PROFILES_PATH = os.getenv("RECORD_PROFILES_PATH", "")
+
+# Admin API key for catalog writes; the admin endpoints are disabled when unset
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY", "")
+
+class LLMUnavailable(Exception):
+    """Raised when an LLM call is refused locally (rate limit, budget or degraded mode)"""
+
+class TokenBucket:
+    """Token-bucket limiter for LLM requests per minute"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = max(per_minute, 1)
+        self.refill_rate = self.capacity / 60.0
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+    async def acquire(self, max_wait: float) -> None:
+        # Check and take happen without an await in between, so concurrent waiters
+        # that wake up together cannot all take the same token
+        deadline = time.monotonic() + max_wait
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            wait = (1 - self.tokens) / self.refill_rate
+            if time.monotonic() + wait > deadline:
+                raise LLMUnavailable("LLM request rate limit reached")
+            await asyncio.sleep(wait)
+
+class TokenBudget:
+    """Sliding one-minute budget of prompt + completion tokens shared by all LLM calls"""
+
+    def __init__(self, per_minute: int):
+        self.limit = per_minute
+        self.entries = deque()  # (timestamp, tokens)
+
+    def _prune(self):
+        cutoff = time.monotonic() - 60
+        while self.entries and self.entries[0][0] < cutoff:
+            self.entries.popleft()
+
+    def used(self) -> int:
+        self._prune()
+        return sum(tokens for _, tokens in self.entries)
+
+    def reserve(self, tokens: int) -> list:
+        if self.used() + tokens > self.limit:
+            raise LLMUnavailable("LLM token budget exhausted for this minute")
+        entry = [time.monotonic(), tokens]
+        self.entries.append(entry)
+        return entry
+
+    def settle(self, entry: list, actual_tokens: int) -> None:
+        """Replace a reservation with the token count reported by the API"""
+        entry[1] = actual_tokens
+
+class LLMHealth:
+    """Tracks recent LLM latency/errors and switches between AI and rule-based mode"""
+
+    WINDOW = 20
+    MIN_SAMPLES = 5
+
+    def __init__(self):
+        self.samples = deque(maxlen=self.WINDOW)  # (latency_seconds, ok)
+        self.mode = "ai"
+        self.degraded_until = 0.0
+        self.probe_in_flight = False
+        self.degraded_count = 0
+
+    def allow(self) -> bool:
+        """Return True if a call may go out; in degraded mode only a single probe is let through"""
+        if self.mode == "ai":
+            return True
+        if time.monotonic() < self.degraded_until or self.probe_in_flight:
+            return False
+        self.probe_in_flight = True
+        return True
+
+    def record(self, latency: float, ok: bool, rate_limited: bool = False) -> None:
+        self.samples.append((latency, ok))
+        if self.mode == "rule_based":
+            self.probe_in_flight = False
+            if ok and latency <= LLM_LATENCY_THRESHOLD_SECONDS:
+                print("✅ LLM probe succeeded, switching back to AI reasoning")
+                self.mode = "ai"
+                self.samples.clear()
+            else:
+                self.degraded_until = time.monotonic() + LLM_DEGRADED_COOLDOWN_SECONDS
+            return
+        if rate_limited or self._unhealthy():
+            self.degrade()
+
+    def _unhealthy(self) -> bool:
+        if len(self.samples) < self.MIN_SAMPLES:
+            return False
+        error_rate = sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+        avg_latency = sum(latency for latency, _ in self.samples) / len(self.samples)
+        return error_rate >= LLM_ERROR_RATE_THRESHOLD or avg_latency >= LLM_LATENCY_THRESHOLD_SECONDS
+
+    def degrade(self) -> None:
+        print(f"⚠️ LLM unhealthy, switching to rule-based reasoning for {LLM_DEGRADED_COOLDOWN_SECONDS:.0f}s")
+        self.mode = "rule_based"
+        self.degraded_until = time.monotonic() + LLM_DEGRADED_COOLDOWN_SECONDS
+        self.degraded_count += 1
+
+    def stats(self) -> dict:
+        count = len(self.samples)
+        return {
+            "mode": self.mode,
+            "degraded_count": self.degraded_count,
+            "window_size": count,
+            "error_rate": round(sum(1 for _, ok in self.samples if not ok) / count, 3) if count else 0.0,
+            "avg_latency_seconds": round(sum(latency for latency, _ in self.samples) / count, 3) if count else 0.0,
+        }
+
+llm_rate_limiter = TokenBucket(LLM_REQUESTS_PER_MINUTE)
+llm_token_budget = TokenBudget(LLM_TOKENS_PER_MINUTE)
+llm_health = LLMHealth()
+llm_counters = {"calls": 0, "errors": 0, "rejected": 0}
+
+async def call_llm(system_message: str, prompt: str, max_tokens: int, temperature: float = 0.7,
+                   response_format: Optional[dict] = None) -> str:
+    """
+    Send a chat completion through the shared rate limiter, token budget and health tracker.
+    Raises LLMUnavailable when the call is refused locally so callers can fall back immediately.
+    """
+    if not OPENAI_API_KEY:
+        raise LLMUnavailable("OpenAI API key not configured")
+    if not llm_health.allow():
+        llm_counters["rejected"] += 1
+        raise LLMUnavailable("LLM degraded, using rule-based mode")
+    # In degraded mode this call is the single probe; it must release the slot however it ends,
+    # including cancellation (client disconnect, worker shutdown) which is not an Exception
+    probing = llm_health.mode == "rule_based"
+    try:
+        try:
+            await llm_rate_limiter.acquire(LLM_MAX_QUEUE_WAIT_SECONDS)
+            # Rough estimate: ~4 characters per token, plus the completion allowance
+            reservation = llm_token_budget.reserve((len(system_message) + len(prompt)) // 4 + max_tokens)
+        except LLMUnavailable:
+            llm_counters["rejected"] += 1
+            raise
+
+        from openai import OpenAI, RateLimitError
+        client = OpenAI(api_key=OPENAI_API_KEY, timeout=LLM_TIMEOUT_SECONDS, max_retries=0)
+
+        llm_counters["calls"] += 1
+        started = time.monotonic()
+        try:
+            response = await asyncio.to_thread(
+                client.chat.completions.create,
+                model=LLM_MODEL,
+                messages=[
+                    {"role": "system", "content": system_message},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=max_tokens,
+                temperature=temperature,
+                **({"response_format": response_format} if response_format else {})
+            )
+        except Exception as e:
+            llm_counters["errors"] += 1
+            llm_health.record(time.monotonic() - started, ok=False, rate_limited=isinstance(e, RateLimitError))
+            raise
+
+        llm_health.record(time.monotonic() - started, ok=True)
+        if getattr(response, "usage", None) is not None:
+            llm_token_budget.settle(reservation, response.usage.total_tokens)
+        return response.choices[0].message.content.strip()
+    finally:
+        if probing:
+            llm_health.probe_in_flight = False
+
+# Profiling (opt-in)
+# When enabled, requests record per-phase spans; a fraction of them also run a
+# stack sampler, and any request slower than the threshold is kept with its
+# phase breakdown in a ring buffer served at /debug/slow-requests.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0.01"))
+PROFILING_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILING_SAMPLE_INTERVAL_MS", "5"))
+PROFILING_SLOW_THRESHOLD_MS = float(os.getenv("PROFILING_SLOW_THRESHOLD_MS", "1000"))
+PROFILING_RING_SIZE = int(os.getenv("PROFILING_RING_SIZE", "50"))
+
+# Job long-polls and event streams are slow by design and would crowd out real slow requests
+JOB_STREAM_PATH = re.compile(r"^/jobs/[^/]+/stream$")
+JOB_STATUS_PATH = re.compile(r"^/jobs/[^/]+$")
+
+def is_long_poll(request: Request) -> bool:
+    """GET /jobs/{id}/stream, or GET /jobs/{id} with a non-zero wait"""
+    if request.method != "GET":
+        return False
+    path = request.url.path
+    if JOB_STREAM_PATH.match(path):
+        return True
+    if not JOB_STATUS_PATH.match(path):
+        return False
+    try:
+        return float(request.query_params.get("wait", 0)) > 0
+    except ValueError:
+        return False
+
+current_request_phases = contextvars.ContextVar("current_request_phases", default=None)
+slow_requests = deque(maxlen=PROFILING_RING_SIZE)
+
+@contextmanager
+def profile_span(name: str):
+    """Add the time spent in the block to the current request's phase breakdown"""
+    phases = current_request_phases.get()
+    if phases is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases[name] = phases.get(name, 0.0) + (time.perf_counter() - started)
+
+class StackSampler(threading.Thread):
+    """
+    Samples the event loop thread's stack at a fixed interval and counts
+    collapsed stacks. Concurrent requests share the loop thread, so samples
+    from overlapping requests are attributed to every sampled one.
+    """
+
+    def __init__(self, target_thread_id: int, interval: float):
+        super().__init__(daemon=True)
+        self.target_thread_id = target_thread_id
+        self.interval = interval
+        self.stacks = {}
+        self.sample_count = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.target_thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            key = ";".join(reversed(stack))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.sample_count += 1
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.join()
+
+    def top(self, limit: int = 10) -> List[dict]:
+        ranked = sorted(self.stacks.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [{"stack": stack, "samples": count} for stack, count in ranked]
 
 # Pydantic models
 class UserProfile(BaseModel):
@@ -73,6 +375,21 @@ class RecommendationResponse(BaseModel):
     recommendations: List[CareerRecommendation]
     user_profile_summary: str
 
+class CareerPath(BaseModel):
+    id: str
+    title: str
+    category: str
+    description: str = ""
+    required_skills: List[str] = []
+    preferred_skills: List[str] = []
+    salary_range: dict = {}
+    growth_potential: int = 0
+    learning_path: List[str] = []
+
+class CatalogChanges(BaseModel):
+    upsert: List[CareerPath] = []
+    delete: List[str] = []
+
 # Comprehensive Career Database (24+ Paths)
 CAREER_DATABASE = [
     # Software Development
@@ -515,6 +832,238 @@ CAREER_DATABASE = [
     }
 ]
 
+# MongoDB projections: only the fields each code path actually reads come over the wire
+SCORING_PROJECTION = {"_id": 0, "id": 1, "title": 1, "category": 1, "required_skills": 1, "preferred_skills": 1}
+SUMMARY_PROJECTION = {"_id": 0, "id": 1, "title": 1, "category": 1, "description": 1,
+                      "required_skills": 1, "salary_range": 1, "growth_potential": 1}
+ROADMAP_PROJECTION = {"_id": 0, "id": 1, "title": 1, "category": 1,
+                      "required_skills": 1, "preferred_skills": 1, "learning_path": 1}
+
+def project_career(career: dict, projection: dict) -> dict:
+    """Apply an inclusion projection to an in-memory career"""
+    return {k: v for k, v in career.items() if projection.get(k)}
+
+class CareerCatalog:
+    """
+    In-memory career catalog with incrementally maintained derived structures:
+    an id lookup, a lowercase search haystack per career, the lowercase skill
+    lists used for scoring and a skill -> career incidence map (for every skill
+    in the catalog, the career skill slots it would satisfy under the same
+    substring rule as calculate_match_score). Every write bumps the catalog version and records the
+    version at which each entry last changed, so ETags and caches keyed on a
+    single career only invalidate when that career changes.
+    """
+
+    def __init__(self, careers: List[dict]):
+        self.generation = uuid.uuid4().hex[:8]
+        self.version = 0
+        self.load(careers)
+
+    def load(self, careers: List[dict]) -> None:
+        """Replace the whole catalog (used at startup when MongoDB has its own data)"""
+        self.careers = {}
+        self.entry_versions = {}
+        self.search_index = {}
+        self.scoring = {}
+        self.skill_names = {}  # lowercase skill -> display name
+        self.skill_refcount = {}  # lowercase skill -> number of career slots listing it
+        self.skill_incidence = {}  # lowercase skill -> {career_id: {"required": set, "preferred": set}}
+        self._summary = None
+        self._summary_version = None  # catalog version _summary was built for
+        self.version += 1
+        for career in careers:
+            self._index(career)
+
+    def _index(self, career: dict) -> None:
+        career = {k: v for k, v in career.items() if k != '_id'}
+        career_id = career["id"]
+        if career_id in self.careers:
+            self._unindex(career_id)
+        self.careers[career_id] = career
+        self.entry_versions[career_id] = self.version
+        self.search_index[career_id] = " ".join([
+            career.get("title", ""),
+            career.get("description", ""),
+            career.get("category", ""),
+            " ".join(career.get("required_skills", [])),
+        ]).lower()
+        self.scoring[career_id] = {
+            "required": [s.lower() for s in career.get("required_skills", [])],
+            "preferred": [s.lower() for s in career.get("preferred_skills", [])],
+            "category": career.get("category", "").lower(),
+        }
+        
+        # New skills may satisfy slots of careers already in the catalog
+        for kind, field in (("required", "required_skills"), ("preferred", "preferred_skills")):
+            for name in career.get(field, []):
+                term = name.lower()
+                self.skill_refcount[term] = self.skill_refcount.get(term, 0) + 1
+                if term not in self.skill_names:
+                    self.skill_names[term] = name
+                    self.skill_incidence[term] = {}
+                    for other_id, other in self.scoring.items():
+                        if other_id != career_id:
+                            self._link(term, other_id, other)
+        # Every known skill may satisfy slots of this career
+        for term in self.skill_incidence:
+            self._link(term, career_id, self.scoring[career_id])
+
+    def _link(self, term: str, career_id: str, scoring: dict) -> None:
+        for kind in ("required", "preferred"):
+            slots = {slot for slot in scoring[kind] if term in slot or slot in term}
+            if slots:
+                entry = self.skill_incidence[term].setdefault(career_id, {"required": set(), "preferred": set()})
+                entry[kind] |= slots
+
+    def _unindex(self, career_id: str) -> None:
+        scoring = self.scoring.pop(career_id, None)
+        self.careers.pop(career_id, None)
+        self.entry_versions.pop(career_id, None)
+        self.search_index.pop(career_id, None)
+        if scoring is None:
+            return
+        for careers in self.skill_incidence.values():
+            careers.pop(career_id, None)
+        for term in scoring["required"] + scoring["preferred"]:
+            self.skill_refcount[term] -= 1
+            if self.skill_refcount[term] == 0:
+                del self.skill_refcount[term]
+                del self.skill_names[term]
+                del self.skill_incidence[term]
+
+    def apply(self, upserts: List[dict], deletes: List[str]) -> List[str]:
+        """Apply a batch of changes as one catalog version and return the affected ids"""
+        self.version += 1
+        for career in upserts:
+            self._index(career)
+        for career_id in deletes:
+            self._unindex(career_id)
+        affected = [c["id"] for c in upserts] + list(deletes)
+        for listener in catalog_listeners:
+            listener(affected)
+        return affected
+
+    def get(self, career_id: str) -> Optional[dict]:
+        return self.careers.get(career_id)
+
+    def all(self) -> List[dict]:
+        return list(self.careers.values())
+
+    def search(self, q: str) -> List[dict]:
+        q = q.lower()
+        return [self.careers[cid] for cid, haystack in self.search_index.items() if q in haystack]
+
+    def scoring_for(self, career: dict) -> dict:
+        """Precomputed scoring fields for a catalog career; computed on the fly for other dicts"""
+        career_id = career.get("id")
+        if career_id is not None and self.careers.get(career_id) is career:
+            return self.scoring[career_id]
+        return {
+            "required": [s.lower() for s in career.get("required_skills", [])],
+            "preferred": [s.lower() for s in career.get("preferred_skills", [])],
+            "category": career.get("category", "").lower(),
+        }
+
+    def related(self, career_id: str, limit: int = 3) -> List[dict]:
+        """Careers sharing the most skills with the given one, with a bonus for the same category"""
+        target = self.scoring.get(career_id)
+        if target is None:
+            return []
+        target_skills = set(target["required"]) | set(target["preferred"])
+        ranked = []
+        for other_id, other in self.scoring.items():
+            if other_id == career_id:
+                continue
+            other_skills = set(other["required"]) | set(other["preferred"])
+            union = target_skills | other_skills
+            similarity = len(target_skills & other_skills) / len(union) if union else 0.0
+            if other["category"] == target["category"]:
+                similarity += 0.5
+            if similarity > 0:
+                ranked.append((similarity, other_id))
+        ranked.sort(key=lambda x: x[0], reverse=True)
+        return [self.careers[other_id] for _, other_id in ranked[:limit]]
+
+    def summary(self) -> dict:
+        """Card-sized catalog listing plus a content hash, recomputed only when the catalog changes"""
+        if self._summary_version != self.version:
+            careers = [project_career(c, SUMMARY_PROJECTION) for c in self.careers.values()]
+            digest = hashlib.sha256(json.dumps(careers, sort_keys=True).encode()).hexdigest()[:16]
+            self._summary = {"version": digest, "careers": careers}
+            self._summary_version = self.version
+        return self._summary
+
+    def etag(self) -> str:
+        return f'"{self.generation}-{self.version}"'
+
+    def entry_etag(self, career_id: str) -> str:
+        return f'"{self.generation}-{career_id}-{self.entry_versions.get(career_id, 0)}"'
+
+# Callbacks invoked with the affected career ids after every catalog write
+catalog_listeners = []
+career_catalog = CareerCatalog(CAREER_DATABASE)
+
+class LRUCache:
+    """Bounded LRU cache with a per-entry TTL"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None or time.monotonic() > entry[0]:
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value) -> None:
+        if self.maxsize <= 0:
+            return
+        self.entries[key] = (time.monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+recommendation_cache = LRUCache(RECOMMENDATION_CACHE_SIZE, RECOMMENDATION_CACHE_TTL_SECONDS)
+
+def profile_cache_key(profile: UserProfile) -> str:
+    """Canonical hash of a profile (order- and case-insensitive skills/interests) plus the catalog version"""
+    def normalize(value: Optional[str]) -> str:
+        return (value or "").strip().lower()
+    canonical = {
+        "skills": sorted(normalize(s) for s in profile.skills),
+        "interests": sorted(normalize(i) for i in profile.interests),
+        "education_level": normalize(profile.education_level),
+        "experience_years": profile.experience_years,
+        "goals": profile.goals.strip(),
+        "current_role": normalize(profile.current_role),
+        "location": normalize(profile.location),
+    }
+    digest = hashlib.sha256(json.dumps(canonical, sort_keys=True).encode()).hexdigest()
+    return f"{career_catalog.generation}-{career_catalog.version}-{digest}"
+
+def invalidate_roadmap_cache(career_ids: List[str]) -> None:
+    for career_id in career_ids:
+        roadmap_cache.pop(career_id, None)
+
+catalog_listeners.append(invalidate_roadmap_cache)
+# Recommendations score the whole catalog, so any change invalidates all of them
+catalog_listeners.append(lambda career_ids: recommendation_cache.clear())
+
 @app.get("/")
 async def root():
     return {
@@ -523,6 +1072,81 @@ async def root():
         "status": "running"
     }
 
+@app.get("/metrics")
+async def get_metrics():
+    """Operational metrics: LLM mode, budget usage and call counters"""
+    return {
+        "llm": {
+            **llm_health.stats(),
+            "calls": llm_counters["calls"],
+            "errors": llm_counters["errors"],
+            "rejected": llm_counters["rejected"],
+            "token_budget": {
+                "used_last_minute": llm_token_budget.used(),
+                "limit_per_minute": llm_token_budget.limit,
+            },
+            "rate_limit": {
+                "available_requests": int(llm_rate_limiter.available()),
+                "requests_per_minute": llm_rate_limiter.capacity,
+            },
+        },
+        "jobs": {
+            "backend": type(job_queue).__name__,
+            "workers": len(job_workers),
+        },
+        "roadmap_cache": {
+            "entries": len(roadmap_cache),
+        },
+        "recommendation_cache": recommendation_cache.stats()
+    }
+
+if PROFILING_ENABLED:
+    @app.middleware("http")
+    async def profiling_middleware(request: Request, call_next):
+        phases = {}
+        token = current_request_phases.set(phases)
+        sampler = None
+        if random.random() < PROFILING_SAMPLE_RATE:
+            sampler = StackSampler(threading.get_ident(), PROFILING_SAMPLE_INTERVAL_MS / 1000)
+            sampler.start()
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            duration = time.perf_counter() - started
+            current_request_phases.reset(token)
+            if sampler is not None:
+                sampler.stop()
+        
+        duration_ms = duration * 1000
+        if duration_ms >= PROFILING_SLOW_THRESHOLD_MS and not is_long_poll(request):
+            breakdown = {name: round(seconds * 1000, 2) for name, seconds in phases.items()}
+            # Whatever the spans do not cover: validation, JSON encoding and framework overhead
+            breakdown["other"] = round(max(duration - sum(phases.values()), 0.0) * 1000, 2)
+            slow_requests.append({
+                "method": request.method,
+                "path": request.url.path,
+                "status_code": response.status_code,
+                "duration_ms": round(duration_ms, 2),
+                "phases_ms": breakdown,
+                "captured_at": datetime.utcnow().isoformat(),
+                "stack_samples": sampler.sample_count if sampler else 0,
+                "top_stacks": sampler.top() if sampler else [],
+            })
+        return response
+
+@app.get("/debug/slow-requests")
+async def get_slow_requests(x_admin_key: Optional[str] = Header(None)):
+    """Slow requests captured by the profiling middleware, newest first"""
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled (set PROFILING_ENABLED=true)")
+    require_admin(x_admin_key)
+    return {
+        "threshold_ms": PROFILING_SLOW_THRESHOLD_MS,
+        "sample_rate": PROFILING_SAMPLE_RATE,
+        "requests": list(reversed(slow_requests)),
+    }
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize database with career data"""
@@ -530,18 +1154,29 @@ async def startup_event():
         if careers_collection is not None:
             count = await careers_collection.count_documents({})
             if count == 0:
-                await careers_collection.insert_many(CAREER_DATABASE)
+                await careers_collection.insert_many([dict(c) for c in CAREER_DATABASE])
                 print(f"✅ Initialized {len(CAREER_DATABASE)} careers in database")
             else:
                 print(f"✅ Database already has {count} careers")
+                careers = await careers_collection.find({}, {"_id": 0}).to_list(length=None)
+                career_catalog.load(careers)
+            try:
+                # Career lookups, top-K hydration and admin upserts all filter on id
+                await careers_collection.create_index("id", unique=True)
+            except Exception as index_error:
+                print(f"⚠️ Could not create careers.id index: {index_error}")
         else:
             print(f"✅ Using in-memory career database ({len(CAREER_DATABASE)} careers)")
     except Exception as e:
         print(f"⚠️ Database initialization error, using in-memory data: {e}")
 
 @app.get("/careers")
-async def get_all_careers():
+async def get_all_careers(request: Request, response: Response):
     """Get all available career paths"""
+    etag = career_catalog.etag()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     try:
         # Try to get from database first
         if careers_collection is not None:
@@ -558,19 +1193,66 @@ async def get_all_careers():
                 print(f"⚠️ Database error, using in-memory data: {db_error}")
         
         # Fallback to in-memory database
-        print(f"✅ Returning {len(CAREER_DATABASE)} careers from in-memory database")
-        return CAREER_DATABASE
+        careers = career_catalog.all()
+        print(f"✅ Returning {len(careers)} careers from in-memory database")
+        return careers
     except Exception as e:
         print(f"❌ Error fetching careers: {e}")
         import traceback
         traceback.print_exc()
         # Always return in-memory data as fallback
-        return CAREER_DATABASE
+        return career_catalog.all()
+
+@app.get("/careers/summary")
+async def get_catalog_summary(version: Optional[str] = None):
+    """
+    Lightweight catalog listing for client-side caching. Pass the version the
+    client already has; if it is still current the career list is omitted.
+    """
+    summary = career_catalog.summary()
+    if version == summary["version"]:
+        return {"version": summary["version"], "changed": False}
+    return {"version": summary["version"], "changed": True, "careers": summary["careers"]}
+
+def search_pipeline(q: str) -> list:
+    """Aggregation pipeline for /careers/search: match, cap and project to card fields on the server"""
+    pattern = re.escape(q)
+    query = {
+        "$or": [
+            {"title": {"$regex": pattern, "$options": "i"}},
+            {"description": {"$regex": pattern, "$options": "i"}},
+            {"category": {"$regex": pattern, "$options": "i"}},
+            {"required_skills": {"$regex": pattern, "$options": "i"}}
+        ]
+    } if q else {}
+    return [{"$match": query}, {"$limit": 50}, {"$project": SUMMARY_PROJECTION}]
+
+@app.get("/careers/search")
+async def search_careers(q: str = ""):
+    """Search careers by query"""
+    try:
+        careers = []
+        if careers_collection is not None:
+            careers = await careers_collection.aggregate(search_pipeline(q)).to_list(length=50)
+
+        if not careers:
+            # Fallback search
+            careers = [project_career(c, SUMMARY_PROJECTION) for c in career_catalog.search(q)]
+        return careers
+    except Exception as e:
+        # Fallback to in-memory search
+        print(f"Error searching careers, falling back to in-memory: {e}")
+        return [project_career(c, SUMMARY_PROJECTION) for c in career_catalog.search(q)]
 
 @app.get("/careers/{career_id}")
-async def get_career(career_id: str):
+async def get_career(career_id: str, request: Request, response: Response):
     """Get specific career details"""
     try:
+        etag = career_catalog.entry_etag(career_id)
+        # Unknown ids still get a tag, so only short-circuit for careers that exist
+        if career_id in career_catalog.careers and request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        
         career = None
         if careers_collection is not None:
             try:
@@ -583,13 +1265,14 @@ async def get_career(career_id: str):
         if career is None:
             # Fallback to in-memory database
             print(f"Searching for career {career_id} in-memory")
-            career = next((c for c in CAREER_DATABASE if c["id"] == career_id), None)
+            career = career_catalog.get(career_id)
 
         if career is None:
             print(f"❌ Career with id {career_id} not found anywhere.")
             raise HTTPException(status_code=404, detail="Career not found")
         
         print(f"✅ Successfully found career: {career.get('title')}")
+        response.headers["ETag"] = etag
         return career
     except HTTPException:
         raise
@@ -599,81 +1282,79 @@ async def get_career(career_id: str):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {e}")
 
-@app.get("/careers/search")
-async def search_careers(q: str = ""):
-    """Search careers by query"""
-    try:
-        careers = []
-        if careers_collection is not None:
-            query = {
-                "$or": [
-                    {"title": {"$regex": q, "$options": "i"}},
-                    {"description": {"$regex": q, "$options": "i"}},
-                    {"category": {"$regex": q, "$options": "i"}},
-                    {"required_skills": {"$regex": q, "$options": "i"}}
-                ]
-            } if q else {}
-            careers = await careers_collection.find(query).to_list(length=50)
-
-        if not careers:
-            # Fallback search
-            careers = [c for c in CAREER_DATABASE if q.lower() in c["title"].lower() or 
-                      q.lower() in c["description"].lower() or 
-                      q.lower() in c["category"].lower()]
-        return careers
-    except Exception as e:
-        # Fallback to in-memory search
-        print(f"Error searching careers, falling back to in-memory: {e}")
-        return [c for c in CAREER_DATABASE if q.lower() in c["title"].lower() or 
-                q.lower() in c["description"].lower()]
-
 @app.post("/recommendations", response_model=RecommendationResponse)
 async def get_recommendations(profile: UserProfile):
     """
     Get AI-powered career recommendations using OpenAI GPT-4o-mini
     """
     try:
-        # Calculate match scores for all careers
-        all_careers = CAREER_DATABASE  # Default to in-memory
-        if careers_collection is not None:
-            try:
-                db_careers = await careers_collection.find({}).to_list(length=100)
-                if db_careers and len(db_careers) > 0:
-                    # Remove MongoDB _id fields
-                    for c in db_careers:
-                        if '_id' in c:
-                            c.pop('_id', None)
-                    all_careers = db_careers
-            except Exception as db_error:
-                print(f"Database error, using in-memory data: {db_error}")
+        if RECORD_PROFILES_PATH:
+            record_profile(profile)
         
-        recommendations = []
+        with profile_span("cache"):
+            cache_key = profile_cache_key(profile)
+            cached = recommendation_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
-        for career in all_careers:
-            match_score = calculate_match_score(profile, career)
-            if match_score > 0.2:  # Only include relevant careers
-                # Generate AI reasoning if OpenAI is available
+        with profile_span("db"):
+            all_careers = career_catalog.all()  # Default to in-memory
+            from_db = False
+            if careers_collection is not None:
                 try:
-                    reasoning = await generate_ai_reasoning(profile, career, match_score)
-                except Exception as ai_error:
-                    print(f"AI reasoning error, using rule-based: {ai_error}")
-                    reasoning = generate_rule_based_reasoning(profile, career, match_score)
-                
-                recommendations.append({
-                    "career": career["title"],
-                    "match_score": match_score,
-                    "reasoning": reasoning,
-                    "required_skills": career.get("required_skills", []),
-                    "learning_path": career.get("learning_path", []),
-                    "salary_range": career.get("salary_range", {}),
-                    "growth_potential": career.get("growth_potential", 0)
-                })
+                    # Only the scoring fields; full documents are hydrated for the top careers below
+                    db_careers = await careers_collection.find({}, SCORING_PROJECTION).to_list(length=100)
+                    if db_careers and len(db_careers) > 0:
+                        all_careers = db_careers
+                        from_db = True
+                except Exception as db_error:
+                    print(f"Database error, using in-memory data: {db_error}")
+        
+        # Calculate match scores for all careers
+        with profile_span("scoring"):
+            scored = []
+            for career in all_careers:
+                match_score = calculate_match_score(profile, career)
+                if match_score > 0.2:  # Only include relevant careers
+                    scored.append((career, match_score))
         
-        # Sort by match score
-        recommendations.sort(key=lambda x: x["match_score"], reverse=True)
+            # Sort by match score and keep the top 3 before generating any reasoning
+            scored.sort(key=lambda x: x[1], reverse=True)
+            scored = scored[:TOP_K_RECOMMENDATIONS]
+        
+        with profile_span("llm"):
+            # Generate AI reasoning if OpenAI is available
+            if LLM_BATCH_REASONING and len(scored) > 1:
+                reasonings = await generate_batch_ai_reasoning(profile, scored)
+            else:
+                reasonings = []
+                for career, match_score in scored:
+                    try:
+                        reasoning = await generate_ai_reasoning(profile, career, match_score)
+                    except Exception as ai_error:
+                        print(f"AI reasoning error, using rule-based: {ai_error}")
+                        reasoning = (generate_rule_based_reasoning(profile, career, match_score), False)
+                    reasonings.append(reasoning)
         
-        # Get top 3 recommendations (or all if less than 3)
-        top_recommendations = recommendations[:3] if len(recommendations) >= 3 else recommendations
+        with profile_span("db"):
+            fallback_careers = all_careers[:3] if not scored else []
+            if from_db:
+                hydrated = await hydrate_careers([career for career, _ in scored] + fallback_careers)
+                scored = [(hydrated.get(career["id"], career), score) for career, score in scored]
+                fallback_careers = [hydrated.get(career["id"], career) for career in fallback_careers]
+        
+        top_recommendations = [
+            {
+                "career": career["title"],
+                "match_score": match_score,
+                "reasoning": reasoning,
+                "required_skills": career.get("required_skills", []),
+                "learning_path": career.get("learning_path", []),
+                "salary_range": career.get("salary_range", {}),
+                "growth_potential": career.get("growth_potential", 0)
+            }
+            for (career, match_score), (reasoning, _) in zip(scored, reasonings)
+        ]
         
         # If no recommendations, return top careers anyway
         if not top_recommendations:
@@ -687,37 +1368,129 @@ async def get_recommendations(profile: UserProfile):
                     "salary_range": career.get("salary_range", {}),
                     "growth_potential": career.get("growth_potential", 0)
                 }
-                for career in all_careers[:3]
+                for career in fallback_careers
             ]
         
         # Generate user profile summary
         profile_summary = f"Profile with {len(profile.skills)} skills, {profile.experience_years} years experience, interested in {', '.join(profile.interests[:3]) if profile.interests else 'various fields'}"
         
-        return {
+        result = {
             "recommendations": top_recommendations,
             "user_profile_summary": profile_summary
         }
+        # Rule-based fallbacks (LLM degraded, over budget or erroring) must not outlive the outage
+        used_fallback = OPENAI_API_KEY and not all(from_llm for _, from_llm in reasonings)
+        if not used_fallback:
+            recommendation_cache.set(cache_key, result)
+        return result
     except Exception as e:
         print(f"Error in get_recommendations: {e}")
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Error generating recommendations: {str(e)}")
 
-async def generate_ai_reasoning(profile: UserProfile, career: dict, score: float) -> str:
-    """Generate AI-powered reasoning using OpenAI ChatGPT API"""
+def hydration_filter(ids: List[str]) -> dict:
+    return {"id": {"$in": ids}}
+
+async def hydrate_careers(careers: List[dict]) -> dict:
+    """Fetch full documents for the given (projected) careers in one query, keyed by id"""
+    ids = [career["id"] for career in careers]
+    if not ids:
+        return {}
+    try:
+        documents = await careers_collection.find(hydration_filter(ids), {"_id": 0}).to_list(length=len(ids))
+        return {doc["id"]: doc for doc in documents}
+    except Exception as db_error:
+        print(f"Database error hydrating careers, using in-memory data: {db_error}")
+        return {cid: career_catalog.get(cid) for cid in ids if career_catalog.get(cid) is not None}
+
+def record_profile(profile: UserProfile) -> None:
+    """Append the profile to the JSONL corpus replayed by evaluate_scoring.py"""
+    try:
+        with open(RECORD_PROFILES_PATH, "a") as f:
+            f.write(json.dumps(profile.model_dump()) + "\n")
+    except OSError as e:
+        print(f"⚠️ Could not record profile: {e}")
+
+@app.post("/recommendations/skill-gaps")
+async def get_skill_gaps(profile: UserProfile, limit: int = 10):
+    """
+    Rank the skills the user does not have by how much adding each one would
+    raise their match scores, summed across all careers. Uses the catalog's
+    skill -> career incidence map so the whole analysis is a single pass.
+    """
+    try:
+        user_skills_lower = [s.lower() for s in profile.skills]
+        weights = {"required": 0.5, "preferred": 0.2}
+        
+        # Per-career state: slots already matched and the score normalizer
+        state = {}
+        for career_id, scoring in career_catalog.scoring.items():
+            max_score = 0.15
+            if scoring["required"]:
+                max_score += 0.5
+            if scoring["preferred"]:
+                max_score += 0.2
+            if profile.interests:
+                max_score += 0.15
+            matched = {
+                kind: {slot for slot in scoring[kind] if any(us in slot or slot in us for us in user_skills_lower)}
+                for kind in weights
+            }
+            state[career_id] = (scoring, matched, max_score)
+        
+        gaps = []
+        for term, careers in career_catalog.skill_incidence.items():
+            if term in user_skills_lower:
+                continue
+            total_gain = 0.0
+            improved = []
+            for career_id, slots in careers.items():
+                scoring, matched, max_score = state[career_id]
+                gain = sum(
+                    weights[kind] * len(slots[kind] - matched[kind]) / len(scoring[kind])
+                    for kind in weights if scoring[kind]
+                ) / max_score
+                if gain > 0:
+                    total_gain += gain
+                    improved.append((career_id, gain))
+            if improved:
+                improved.sort(key=lambda x: x[1], reverse=True)
+                gaps.append({
+                    "skill": career_catalog.skill_names[term],
+                    "total_gain": round(total_gain, 4),
+                    "careers_improved": len(improved),
+                    "top_careers": [
+                        {
+                            "id": career_id,
+                            "career": career_catalog.get(career_id)["title"],
+                            "score_gain": round(gain, 4),
+                        }
+                        for career_id, gain in improved[:3]
+                    ],
+                })
+        
+        gaps.sort(key=lambda x: x["total_gain"], reverse=True)
+        return {
+            "skill_gaps": gaps[:max(limit, 0)],
+            "careers_considered": len(state),
+        }
+    except Exception as e:
+        print(f"Error in get_skill_gaps: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error computing skill gaps: {str(e)}")
+
+async def generate_ai_reasoning(profile: UserProfile, career: dict, score: float) -> Tuple[str, bool]:
+    """Generate AI-powered reasoning using OpenAI ChatGPT API; returns (reasoning, from_llm)"""
     try:
         if not OPENAI_API_KEY:
             # Fallback to rule-based reasoning
-            return generate_rule_based_reasoning(profile, career, score)
+            return generate_rule_based_reasoning(profile, career, score), False
         
         prompt = f"""Analyze why this career path matches the user profile and provide a brief, personalized explanation (2-3 sentences).
 
-User Profile:
-- Skills: {', '.join(profile.skills[:10])}
-- Interests: {', '.join(profile.interests[:5])}
-- Experience: {profile.experience_years} years
-- Education: {profile.education_level}
-- Goals: {profile.goals}
+{format_profile_block(profile)}
 
 Career: {career['title']}
 Category: {career['category']}
@@ -726,23 +1499,83 @@ Match Score: {score:.0%}
 
 Provide a personalized explanation of why this career is a good fit:"""
         
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",  # Using ChatGPT model
-            messages=[
-                {"role": "system", "content": "You are a career guidance expert providing personalized career recommendations."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=150,
-            temperature=0.7
+        reasoning = await call_llm(
+            "You are a career guidance expert providing personalized career recommendations.",
+            prompt,
+            max_tokens=150
         )
-        
-        return response.choices[0].message.content.strip()
+        return reasoning, True
+    except LLMUnavailable:
+        return generate_rule_based_reasoning(profile, career, score), False
     except Exception as e:
         print(f"OpenAI API error: {e}")
-        return generate_rule_based_reasoning(profile, career, score)
+        return generate_rule_based_reasoning(profile, career, score), False
+
+def format_profile_block(profile: UserProfile) -> str:
+    """User profile section shared by the reasoning prompts"""
+    return f"""User Profile:
+- Skills: {', '.join(profile.skills[:10])}
+- Interests: {', '.join(profile.interests[:5])}
+- Experience: {profile.experience_years} years
+- Education: {profile.education_level}
+- Goals: {profile.goals}"""
+
+async def generate_batch_ai_reasoning(profile: UserProfile, scored_careers: list) -> List[Tuple[str, bool]]:
+    """
+    Generate reasoning for all top careers in a single completion, as (reasoning, from_llm) pairs.
+    The model returns a JSON object keyed by career id; any missing or invalid
+    entry falls back to rule-based reasoning for that career only.
+    """
+    fallbacks = [(generate_rule_based_reasoning(profile, career, score), False) for career, score in scored_careers]
+    if not OPENAI_API_KEY:
+        return fallbacks
+    
+    careers_block = "\n\n".join(
+        f"""- id: {career['id']}
+  Career: {career['title']}
+  Category: {career['category']}
+  Required Skills: {', '.join(career.get('required_skills', [])[:5])}
+  Match Score: {score:.0%}"""
+        for career, score in scored_careers
+    )
+    prompt = f"""Analyze why each career path below matches the user profile and provide a brief, personalized explanation (2-3 sentences) for each.
+
+{format_profile_block(profile)}
+
+Careers:
+{careers_block}
+
+Respond with a JSON object of the form {{"reasonings": [{{"id": "<career id>", "reasoning": "<explanation>"}}]}} containing one entry per career."""
+    
+    try:
+        content = await call_llm(
+            "You are a career guidance expert providing personalized career recommendations.",
+            prompt,
+            max_tokens=150 * len(scored_careers),
+            response_format={"type": "json_object"}
+        )
+        items = json.loads(content).get("reasonings", [])
+    except LLMUnavailable:
+        return fallbacks
+    except Exception as e:
+        print(f"Batch AI reasoning error, using rule-based: {e}")
+        return fallbacks
+    
+    by_id = {}
+    if isinstance(items, list):
+        for item in items:
+            if isinstance(item, dict) and isinstance(item.get("id"), str) \
+                    and isinstance(item.get("reasoning"), str) and item["reasoning"].strip():
+                by_id[item["id"]] = item["reasoning"].strip()
+    
+    reasonings = [
+        (by_id[career["id"]], True) if career["id"] in by_id else fallback
+        for (career, _), fallback in zip(scored_careers, fallbacks)
+    ]
+    missing = sum(1 for (career, _) in scored_careers if career["id"] not in by_id)
+    if missing:
+        print(f"⚠️ Batch AI reasoning missing {missing} of {len(scored_careers)} careers, used rule-based for those")
+    return reasonings
 
 def generate_rule_based_reasoning(profile: UserProfile, career: dict, score: float) -> str:
     """Generate rule-based reasoning when AI is not available"""
@@ -769,13 +1602,14 @@ def calculate_match_score(profile: UserProfile, career: dict) -> float:
     max_score = 0.0
     
     user_skills_lower = [s.lower() for s in profile.skills]
-    required_skills = career.get("required_skills", [])
-    preferred_skills = career.get("preferred_skills", [])
+    scoring = career_catalog.scoring_for(career)
+    required_skills = scoring["required"]
+    preferred_skills = scoring["preferred"]
     
     # Required skills matching (50% weight)
     if required_skills:
         matching_required = sum(1 for skill in required_skills 
-                               if any(us in skill.lower() or skill.lower() in us 
+                               if any(us in skill or skill in us 
                                      for us in user_skills_lower))
         skill_match = matching_required / len(required_skills)
         score += skill_match * 0.5
@@ -784,7 +1618,7 @@ def calculate_match_score(profile: UserProfile, career: dict) -> float:
     # Preferred skills matching (20% weight)
     if preferred_skills:
         matching_preferred = sum(1 for skill in preferred_skills 
-                                if any(us in skill.lower() or skill.lower() in us 
+                                if any(us in skill or skill in us 
                                       for us in user_skills_lower))
         preferred_match = matching_preferred / len(preferred_skills)
         score += preferred_match * 0.2
@@ -797,7 +1631,7 @@ def calculate_match_score(profile: UserProfile, career: dict) -> float:
     
     # Interest matching (15% weight)
     if profile.interests:
-        category_lower = career["category"].lower()
+        category_lower = scoring["category"]
         interest_match = any(interest.lower() in category_lower or 
                             category_lower in interest.lower() 
                             for interest in profile.interests)
@@ -807,51 +1641,129 @@ def calculate_match_score(profile: UserProfile, career: dict) -> float:
     
     return min(score / max_score if max_score > 0 else 0, 1.0)
 
+async def find_career(career_id: str, projection: Optional[dict] = None) -> Optional[dict]:
+    """Look up a career by id in MongoDB, falling back to the in-memory database"""
+    career = None
+    if careers_collection is not None:
+        try:
+            career = await careers_collection.find_one({"id": career_id}, projection or {"_id": 0})
+        except Exception as db_error:
+            print(f"Database error, using in-memory: {db_error}")
+    
+    if career is None:
+        # Fallback to in-memory database
+        career = career_catalog.get(career_id)
+    return career
+
+def roadmap_response(career: dict, roadmap_steps: List[str]) -> dict:
+    return {
+        "career": career["title"],
+        "roadmap": roadmap_steps,
+        "required_skills": career.get("required_skills", []),
+        "preferred_skills": career.get("preferred_skills", []),
+        "estimated_time": "6-12 months",
+        "difficulty": "Intermediate to Advanced"
+    }
+
+async def build_learning_roadmap(career: dict, require_enhanced: bool = False) -> dict:
+    """
+    Build the roadmap response for a career, enhancing it with AI and caching enhanced results.
+    With require_enhanced, a failed AI enhancement raises instead of returning the base roadmap.
+    """
+    # Get enhanced roadmap using ChatGPT if API key is available
+    base_steps = career.get("learning_path", [])
+    roadmap_steps = base_steps
+    
+    if OPENAI_API_KEY and roadmap_steps:
+        try:
+            with profile_span("llm"):
+                roadmap_steps = await enhance_roadmap_with_ai(career, base_steps)
+        except Exception as ai_error:
+            print(f"AI enhancement failed, using default roadmap: {ai_error}")
+    
+    if require_enhanced and OPENAI_API_KEY and base_steps and roadmap_steps is base_steps:
+        raise RuntimeError(f"AI roadmap enhancement failed for '{career['id']}'")
+    
+    roadmap = roadmap_response(career, roadmap_steps)
+    # Only AI-enhanced roadmaps are cached so a temporary LLM outage is not remembered
+    if roadmap_steps is not base_steps:
+        roadmap_cache[career["id"]] = (time.monotonic() + ROADMAP_CACHE_TTL_SECONDS, roadmap)
+    return roadmap
+
+def get_cached_roadmap(career_id: str) -> Optional[dict]:
+    entry = roadmap_cache.get(career_id)
+    if entry is None:
+        return None
+    expires_at, roadmap = entry
+    if time.monotonic() > expires_at:
+        roadmap_cache.pop(career_id, None)
+        return None
+    return roadmap
+
 @app.get("/careers/{career_id}/roadmap")
 async def get_learning_roadmap(career_id: str):
     """Get learning roadmap for a specific career"""
     try:
-        career = None
-        if careers_collection is not None:
-            try:
-                career = await careers_collection.find_one({"id": career_id})
-                if career and '_id' in career:
-                    career.pop('_id', None)
-            except Exception as db_error:
-                print(f"Database error, using in-memory: {db_error}")
+        with profile_span("cache"):
+            cached = get_cached_roadmap(career_id)
+        if cached is not None:
+            return cached
         
+        with profile_span("db"):
+            career = await find_career(career_id, ROADMAP_PROJECTION)
         if career is None:
-            # Fallback to in-memory database
-            career = next((c for c in CAREER_DATABASE if c["id"] == career_id), None)
+            raise HTTPException(status_code=404, detail=f"Career with id '{career_id}' not found")
         
+        return await build_learning_roadmap(career)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in get_learning_roadmap: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error generating roadmap: {str(e)}")
+
+@app.get("/careers/{career_id}/bootstrap")
+async def get_career_bootstrap(career_id: str):
+    """
+    Everything the career details page needs in one response: the career, its
+    roadmap and related careers. The roadmap is served from the cache when an
+    AI-enhanced version exists; otherwise the base roadmap is returned and, if
+    AI is available, a background job id the client can poll for the enhanced one.
+    """
+    try:
+        with profile_span("db"):
+            career = await find_career(career_id)
         if career is None:
             raise HTTPException(status_code=404, detail=f"Career with id '{career_id}' not found")
         
-        # Get enhanced roadmap using ChatGPT if API key is available
-        roadmap_steps = career.get("learning_path", [])
-        
-        if OPENAI_API_KEY and roadmap_steps:
-            try:
-                enhanced_roadmap = await enhance_roadmap_with_ai(career, roadmap_steps)
-                roadmap_steps = enhanced_roadmap
-            except Exception as ai_error:
-                print(f"AI enhancement failed, using default roadmap: {ai_error}")
-        
+        roadmap = get_cached_roadmap(career_id)
+        roadmap_enhanced = roadmap is not None
+        roadmap_job_id = None
+        if roadmap is None:
+            roadmap = roadmap_response(career, career.get("learning_path", []))
+            if OPENAI_API_KEY and llm_health.mode == "ai" and career.get("learning_path"):
+                # The enhanced roadmap is optional; a queue failure must not break the page
+                try:
+                    job = await enqueue_roadmap(career_id)
+                    roadmap_job_id = job["id"]
+                except Exception as e:
+                    print(f"⚠️ Could not queue roadmap job for {career_id}: {e}")
+
         return {
-            "career": career["title"],
-            "roadmap": roadmap_steps,
-            "required_skills": career.get("required_skills", []),
-            "preferred_skills": career.get("preferred_skills", []),
-            "estimated_time": "6-12 months",
-            "difficulty": "Intermediate to Advanced"
+            "career": career,
+            "roadmap": roadmap,
+            "roadmap_enhanced": roadmap_enhanced,
+            "roadmap_job_id": roadmap_job_id,
+            "related_careers": [project_career(c, SUMMARY_PROJECTION) for c in career_catalog.related(career_id)],
         }
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in get_learning_roadmap: {e}")
+        print(f"Error in get_career_bootstrap: {e}")
         import traceback
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Error generating roadmap: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error loading career: {str(e)}")
 
 async def enhance_roadmap_with_ai(career: dict, base_roadmap: list) -> list:
     """Enhance roadmap with AI-generated detailed steps"""
@@ -859,9 +1771,6 @@ async def enhance_roadmap_with_ai(career: dict, base_roadmap: list) -> list:
         if not OPENAI_API_KEY:
             return base_roadmap
         
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        
         prompt = f"""For the career path "{career['title']}" in {career['category']}, provide a detailed learning roadmap.
         
 Base steps:
@@ -869,25 +1778,365 @@ Base steps:
 
 Provide the same roadmap but with more detailed, actionable steps. Return only the steps, one per line, without numbering."""
         
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an educational expert providing detailed learning roadmaps."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=500,
-            temperature=0.7
+        ai_roadmap = await call_llm(
+            "You are an educational expert providing detailed learning roadmaps.",
+            prompt,
+            max_tokens=500
         )
-        
-        ai_roadmap = response.choices[0].message.content.strip()
         # Parse the AI response into a list
         enhanced_steps = [step.strip().lstrip('- ').strip() for step in ai_roadmap.split('\n') if step.strip()]
         
         return enhanced_steps if enhanced_steps else base_roadmap
+    except LLMUnavailable:
+        return base_roadmap
     except Exception as e:
         print(f"AI roadmap enhancement error: {e}")
         return base_roadmap
 
+def require_admin(x_admin_key: Optional[str]) -> None:
+    if not ADMIN_API_KEY:
+        raise HTTPException(status_code=403, detail="Admin API is disabled (ADMIN_API_KEY not set)")
+    if not x_admin_key or not hmac.compare_digest(x_admin_key.encode(), ADMIN_API_KEY.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin key")
+
+@app.post("/admin/careers/bulk")
+async def update_catalog(changes: CatalogChanges, x_admin_key: Optional[str] = Header(None)):
+    """Upsert and delete careers in bulk, updating the in-memory catalog incrementally"""
+    require_admin(x_admin_key)
+    upserts = [career.model_dump() for career in changes.upsert]
+    overlap = {c["id"] for c in upserts} & set(changes.delete)
+    if overlap:
+        raise HTTPException(status_code=400, detail=f"Careers both upserted and deleted: {', '.join(sorted(overlap))}")
+    
+    if careers_collection is not None:
+        from pymongo import DeleteMany, ReplaceOne
+        operations = [ReplaceOne({"id": c["id"]}, dict(c), upsert=True) for c in upserts]
+        if changes.delete:
+            operations.append(DeleteMany({"id": {"$in": changes.delete}}))
+        if operations:
+            try:
+                await careers_collection.bulk_write(operations, ordered=False)
+            except Exception as db_error:
+                print(f"❌ Database error in update_catalog: {db_error}")
+                raise HTTPException(status_code=503, detail=f"Could not write careers to database: {db_error}")
+    
+    affected = career_catalog.apply(upserts, changes.delete)
+    print(f"✅ Catalog updated to version {career_catalog.version} ({len(affected)} careers changed)")
+    return {
+        "upserted": len(upserts),
+        "deleted": len(changes.delete),
+        "catalog_version": career_catalog.version,
+    }
+
+# Background jobs
+# Roadmap generation and bulk AI work run off the request path. Jobs are kept in
+# memory by default; set JOB_QUEUE_BACKEND=mongo to persist them in MongoDB so
+# queued work survives a restart.
+
+JOB_TERMINAL_STATUSES = ("completed", "failed")
+
+class BaseJobQueue:
+    """Interface shared by the in-memory and MongoDB job queues"""
+
+    def new_job(self, kind: str, payload: dict) -> dict:
+        now = datetime.utcnow()
+        return {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "payload": payload,
+            "status": "queued",
+            "attempts": 0,
+            "result": None,
+            "error": None,
+            "run_after": now,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    async def setup(self) -> None:
+        """Prepare the backing store at startup"""
+
+    async def enqueue(self, kind: str, payload: dict) -> dict:
+        raise NotImplementedError
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def next(self) -> dict:
+        """Wait for the next queued job, mark it running and return it"""
+        raise NotImplementedError
+
+    async def update(self, job_id: str, **fields) -> None:
+        raise NotImplementedError
+
+    async def retry(self, job_id: str, delay: float) -> None:
+        raise NotImplementedError
+
+class JobQueue(BaseJobQueue):
+    """In-process asyncio job queue"""
+
+    def __init__(self, history_limit: int = 1000):
+        self.jobs = {}
+        self.queue = asyncio.Queue()
+        self.history_limit = history_limit
+
+    async def enqueue(self, kind: str, payload: dict) -> dict:
+        job = self.new_job(kind, payload)
+        self.jobs[job["id"]] = job
+        self._prune()
+        await self.queue.put(job["id"])
+        return dict(job)
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        job = self.jobs.get(job_id)
+        return dict(job) if job else None
+
+    async def next(self) -> dict:
+        while True:
+            job_id = await self.queue.get()
+            job = self.jobs.get(job_id)
+            if job and job["status"] == "queued":
+                job["status"] = "running"
+                job["attempts"] += 1
+                job["updated_at"] = datetime.utcnow()
+                return dict(job)
+
+    async def update(self, job_id: str, **fields) -> None:
+        job = self.jobs.get(job_id)
+        if job:
+            job.update(fields, updated_at=datetime.utcnow())
+
+    async def retry(self, job_id: str, delay: float) -> None:
+        await self.update(job_id, status="queued")
+        asyncio.get_running_loop().call_later(delay, self.queue.put_nowait, job_id)
+
+    def _prune(self) -> None:
+        # Drop the oldest finished jobs once the history limit is exceeded
+        excess = len(self.jobs) - self.history_limit
+        if excess <= 0:
+            return
+        for job_id in [j["id"] for j in self.jobs.values() if j["status"] in JOB_TERMINAL_STATUSES][:excess]:
+            self.jobs.pop(job_id, None)
+
+class MongoJobQueue(BaseJobQueue):
+    """Durable job queue stored in the MongoDB jobs collection"""
+
+    POLL_INTERVAL_SECONDS = 1.0
+    PRUNE_INTERVAL_SECONDS = 60.0
+
+    def __init__(self, collection, history_seconds: float):
+        self.collection = collection
+        self.history_seconds = history_seconds
+        self.last_pruned = 0.0
+
+    async def setup(self) -> None:
+        await self.collection.create_index("id", unique=True)
+        # Matches the filter and sort of the polling find_one_and_update in next()
+        await self.collection.create_index([("status", 1), ("run_after", 1), ("created_at", 1)])
+        await self.recover()
+        await self.prune()
+
+    async def enqueue(self, kind: str, payload: dict) -> dict:
+        job = self.new_job(kind, payload)
+        await self.collection.insert_one(dict(job))
+        if time.monotonic() - self.last_pruned > self.PRUNE_INTERVAL_SECONDS:
+            await self.prune()
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await self.collection.find_one({"id": job_id}, {"_id": 0})
+
+    async def next(self) -> dict:
+        from pymongo import ReturnDocument
+        while True:
+            now = datetime.utcnow()
+            job = await self.collection.find_one_and_update(
+                {"status": "queued", "run_after": {"$lte": now}},
+                {"$set": {"status": "running", "updated_at": now}, "$inc": {"attempts": 1}},
+                projection={"_id": 0},
+                sort=[("created_at", 1)],
+                return_document=ReturnDocument.AFTER
+            )
+            if job:
+                return job
+            await asyncio.sleep(self.POLL_INTERVAL_SECONDS)
+
+    async def update(self, job_id: str, **fields) -> None:
+        fields["updated_at"] = datetime.utcnow()
+        await self.collection.update_one({"id": job_id}, {"$set": fields})
+
+    async def retry(self, job_id: str, delay: float) -> None:
+        run_after = datetime.utcnow() + timedelta(seconds=delay)
+        await self.update(job_id, status="queued", run_after=run_after)
+
+    async def recover(self) -> None:
+        """Requeue jobs left running by a previous process"""
+        result = await self.collection.update_many({"status": "running"}, {"$set": {"status": "queued"}})
+        if result.modified_count:
+            print(f"✅ Requeued {result.modified_count} interrupted jobs")
+
+    async def prune(self) -> None:
+        """Delete finished jobs older than the history window"""
+        self.last_pruned = time.monotonic()
+        cutoff = datetime.utcnow() - timedelta(seconds=self.history_seconds)
+        await self.collection.delete_many({"status": {"$in": list(JOB_TERMINAL_STATUSES)}, "updated_at": {"$lt": cutoff}})
+
+if JOB_QUEUE_BACKEND == "mongo" and db is not None:
+    job_queue = MongoJobQueue(db.jobs, JOB_HISTORY_SECONDS)
+else:
+    job_queue = JobQueue()
+job_workers = []
+
+async def run_roadmap_job(payload: dict) -> dict:
+    career = await find_career(payload["career_id"], ROADMAP_PROJECTION)
+    if career is None:
+        raise LookupError(f"Career with id '{payload['career_id']}' not found")
+    # Raise when enhancement fails so the worker retries instead of completing with the base roadmap
+    return await build_learning_roadmap(career, require_enhanced=True)
+
+JOB_HANDLERS = {
+    "roadmap": run_roadmap_job,
+}
+
+async def job_worker(worker_id: int):
+    """Pull jobs off the queue and run them, retrying failures with exponential backoff"""
+    while True:
+        try:
+            job = await job_queue.next()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Job worker {worker_id} could not fetch a job, retrying in {JOB_QUEUE_ERROR_BACKOFF_SECONDS:.0f}s: {e}")
+            await asyncio.sleep(JOB_QUEUE_ERROR_BACKOFF_SECONDS)
+            continue
+        try:
+            await run_job(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Recording the outcome failed (e.g. MongoDB unavailable); keep the worker alive
+            print(f"⚠️ Job worker {worker_id} could not record the result of job {job['id']}: {e}")
+
+async def run_job(job: dict) -> None:
+    """Run one job and record completion, a scheduled retry or the final failure"""
+    handler = JOB_HANDLERS.get(job["kind"])
+    try:
+        if handler is None:
+            raise LookupError(f"Unknown job kind '{job['kind']}'")
+        result = await handler(job["payload"])
+    except asyncio.CancelledError:
+        await job_queue.update(job["id"], status="queued")
+        raise
+    except Exception as e:
+        retryable = not isinstance(e, LookupError)
+        if retryable and job["attempts"] <= JOB_MAX_RETRIES:
+            delay = 2 ** (job["attempts"] - 1)
+            print(f"⚠️ Job {job['id']} failed (attempt {job['attempts']}), retrying in {delay}s: {e}")
+            await job_queue.retry(job["id"], delay)
+        else:
+            print(f"❌ Job {job['id']} failed: {e}")
+            await job_queue.update(job["id"], status="failed", error=str(e))
+        return
+    await job_queue.update(job["id"], status="completed", result=result, error=None)
+
+@app.on_event("startup")
+async def start_job_workers():
+    """Start background job workers"""
+    try:
+        await job_queue.setup()
+    except Exception as e:
+        print(f"⚠️ Could not prepare job queue: {e}")
+    for worker_id in range(JOB_WORKERS):
+        job_workers.append(asyncio.create_task(job_worker(worker_id)))
+    print(f"✅ Started {JOB_WORKERS} job workers ({type(job_queue).__name__})")
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    for task in job_workers:
+        task.cancel()
+    await asyncio.gather(*job_workers, return_exceptions=True)
+    job_workers.clear()
+
+# Queued/running roadmap job per career, so repeated requests share one job
+roadmap_jobs_in_flight = {}  # career_id -> job_id
+roadmap_jobs_lock = asyncio.Lock()
+
+async def enqueue_roadmap(career_id: str) -> dict:
+    """Queue a roadmap job for the career unless one is already queued or running"""
+    async with roadmap_jobs_lock:
+        job_id = roadmap_jobs_in_flight.get(career_id)
+        if job_id is not None:
+            job = await job_queue.get(job_id)
+            if job is not None and job["status"] not in JOB_TERMINAL_STATUSES:
+                return job
+        job = await job_queue.enqueue("roadmap", {"career_id": career_id})
+        roadmap_jobs_in_flight[career_id] = job["id"]
+        return job
+
+def job_response(job: dict) -> dict:
+    return {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "result": job.get("result"),
+        "error": job.get("error"),
+    }
+
+@app.post("/careers/{career_id}/roadmap/jobs", status_code=202)
+async def enqueue_roadmap_job(career_id: str):
+    """Queue roadmap generation and return a job id immediately"""
+    cached = get_cached_roadmap(career_id)
+    if cached is not None:
+        return {"job_id": None, "kind": "roadmap", "status": "completed", "attempts": 0, "result": cached, "error": None}
+    if await find_career(career_id, {"_id": 0, "id": 1}) is None:
+        raise HTTPException(status_code=404, detail=f"Career with id '{career_id}' not found")
+    job = await enqueue_roadmap(career_id)
+    return job_response(job)
+
+@app.post("/jobs/roadmaps", status_code=202)
+async def enqueue_all_roadmaps(x_admin_key: Optional[str] = Header(None)):
+    """Precompute AI roadmaps for every career that is not already cached (admin only)"""
+    require_admin(x_admin_key)
+    jobs = []
+    for career in career_catalog.all():
+        if get_cached_roadmap(career["id"]) is None:
+            jobs.append(await enqueue_roadmap(career["id"]))
+    return {"queued": len(jobs), "job_ids": [job["id"] for job in jobs]}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = 0):
+    """Get job status; pass wait=<seconds> to long-poll until the job finishes"""
+    deadline = time.monotonic() + min(max(wait, 0), 30)
+    while True:
+        job = await job_queue.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        if job["status"] in JOB_TERMINAL_STATUSES or time.monotonic() >= deadline:
+            return job_response(job)
+        await asyncio.sleep(0.25)
+
+@app.get("/jobs/{job_id}/stream")
+async def stream_job(job_id: str):
+    """Stream job status changes as server-sent events until the job finishes"""
+    if await job_queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def events():
+        last_status = None
+        while True:
+            job = await job_queue.get(job_id)
+            if job is None:
+                return
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield f"data: {json.dumps(job_response(job))}\n\n"
+            if job["status"] in JOB_TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(0.25)
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
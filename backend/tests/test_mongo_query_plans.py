@@ -0,0 +1,129 @@
+"""
+Query-plan checks for the MongoDB data access in server.py.
+
+These run against a real mongod (MONGODB_TEST_URL, default
+mongodb://localhost:27017) in a throwaway database and are skipped when none
+is reachable.
+"""
+
+import asyncio
+import os
+
+import motor.motor_asyncio
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+import server
+
+MONGODB_TEST_URL = os.getenv("MONGODB_TEST_URL", "mongodb://localhost:27017")
+TEST_DB = "career_path_db_test"
+
+
+@pytest.fixture(scope="module")
+def careers():
+    client = MongoClient(MONGODB_TEST_URL, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        pytest.skip(f"no mongod reachable at {MONGODB_TEST_URL}")
+    client.drop_database(TEST_DB)
+
+    # Seed the collection and create indexes through the server's own startup hook
+    motor_client = motor.motor_asyncio.AsyncIOMotorClient(MONGODB_TEST_URL)
+    original = server.careers_collection
+    server.careers_collection = motor_client[TEST_DB].careers
+    try:
+        asyncio.run(server.startup_event())
+    finally:
+        server.careers_collection = original
+        motor_client.close()
+
+    yield client[TEST_DB].careers
+    client.drop_database(TEST_DB)
+    client.close()
+
+
+def winning_stages(explain):
+    """Every stage of the winning plan(s) in an explain document, for classic and SBE output"""
+    stages = []
+
+    def walk(node, in_winning_plan):
+        if isinstance(node, dict):
+            if in_winning_plan and "stage" in node:
+                stages.append(node)
+            for key, value in node.items():
+                if key == "rejectedPlans":
+                    continue
+                walk(value, in_winning_plan or key == "winningPlan")
+        elif isinstance(node, list):
+            for value in node:
+                walk(value, in_winning_plan)
+
+    walk(explain, False)
+    return stages
+
+
+def normalized(projection):
+    return {key: bool(value) for key, value in projection.items()}
+
+
+def assert_projection_stage(explain, projection):
+    projections = [s for s in winning_stages(explain) if s["stage"].startswith("PROJECTION")]
+    assert projections, f"no projection stage in plan: {[s['stage'] for s in winning_stages(explain)]}"
+    assert any(normalized(s.get("transformBy", {})) == normalized(projection) for s in projections)
+
+
+def assert_uses_id_index(explain):
+    stages = winning_stages(explain)
+    names = [s["stage"] for s in stages]
+    assert "COLLSCAN" not in names, names
+    assert any(s["stage"] == "IXSCAN" and s.get("indexName") == "id_1" for s in stages), names
+
+
+def test_id_index_exists(careers):
+    index = careers.index_information()["id_1"]
+    assert index["key"] == [("id", 1)]
+    assert index.get("unique") is True
+
+
+def test_scoring_find_applies_projection(careers):
+    explain = careers.find({}, server.SCORING_PROJECTION).explain()
+    assert_projection_stage(explain, server.SCORING_PROJECTION)
+
+    allowed = {key for key, value in server.SCORING_PROJECTION.items() if value}
+    documents = list(careers.find({}, server.SCORING_PROJECTION))
+    assert len(documents) == len(server.CAREER_DATABASE)
+    assert all(set(doc) <= allowed for doc in documents)
+    assert not any("learning_path" in doc or "description" in doc for doc in documents)
+
+
+def test_id_lookup_uses_index(careers):
+    explain = careers.find({"id": "data-analyst"}, server.ROADMAP_PROJECTION).explain()
+    assert_uses_id_index(explain)
+    assert_projection_stage(explain, server.ROADMAP_PROJECTION)
+
+
+def test_hydration_uses_index(careers):
+    ids = ["data-analyst", "data-engineer", "frontend-developer"]
+    explain = careers.find(server.hydration_filter(ids), {"_id": 0}).explain()
+    assert_uses_id_index(explain)
+    assert {doc["id"] for doc in careers.find(server.hydration_filter(ids), {"_id": 0})} == set(ids)
+
+
+def test_search_aggregation_projects_on_server(careers):
+    pipeline = server.search_pipeline("data")
+    explain = careers.database.command("aggregate", careers.name, pipeline=pipeline, explain=True)
+    # Depending on the server version the $project is pushed into the query
+    # layer (a PROJECTION stage) or kept as a pipeline stage
+    pushed_down = any(
+        s["stage"].startswith("PROJECTION") and normalized(s.get("transformBy", {})) == normalized(server.SUMMARY_PROJECTION)
+        for s in winning_stages(explain)
+    )
+    pipeline_stage = any("$project" in stage for stage in explain.get("stages", []))
+    assert pushed_down or pipeline_stage
+
+    allowed = {key for key, value in server.SUMMARY_PROJECTION.items() if value}
+    documents = list(careers.aggregate(pipeline))
+    assert documents
+    assert all(set(doc) <= allowed for doc in documents)
@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { Search, Filter, ArrowRight, TrendingUp, DollarSign } from 'lucide-react';
-import { getCareers, searchCareers } from '../lib/api';
+import { getCatalogSummary } from '../lib/api';
 
 const CareerBrowser = () => {
   const [careers, setCareers] = useState([]);
@@ -23,7 +23,7 @@ const CareerBrowser = () => {
   const loadCareers = async () => {
     try {
       setLoading(true);
-      const data = await getCareers();
+      const data = await getCatalogSummary();
       console.log('Loaded careers:', data?.length || 0);
       if (data && Array.isArray(data) && data.length > 0) {
         setCareers(data);
@@ -33,7 +33,7 @@ const CareerBrowser = () => {
         // Retry once after a delay
         setTimeout(async () => {
           try {
-            const retryData = await getCareers();
+            const retryData = await getCatalogSummary();
             if (retryData && Array.isArray(retryData) && retryData.length > 0) {
               setCareers(retryData);
               setFilteredCareers(retryData);
@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useParams, Link } from 'react-router-dom';
 import { ArrowLeft, BookOpen, DollarSign, TrendingUp, CheckCircle, Target, Clock } from 'lucide-react';
-import { getCareerById, getLearningRoadmap } from '../lib/api';
+import { getCareerBootstrap, getJob } from '../lib/api';
 
 const CareerDetails = () => {
   const { id } = useParams();
@@ -10,42 +10,49 @@ const CareerDetails = () => {
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
-    loadCareerDetails();
+    // Ignore late responses once the user has moved on to another career
+    let cancelled = false;
+    loadCareerDetails(() => cancelled);
+    return () => {
+      cancelled = true;
+    };
   }, [id]);
 
-  const loadCareerDetails = async () => {
+  const loadCareerDetails = async (isCancelled) => {
+    let roadmapJobId = null;
     try {
       setLoading(true);
-      const careerData = await getCareerById(id);
-      console.log('Career data:', careerData);
-      setCareer(careerData);
-      
-      // Use career's learning_path as a fallback roadmap first
-      if (careerData && careerData.learning_path) {
-        setRoadmap({
-          career: careerData.title,
-          roadmap: careerData.learning_path,
-          required_skills: careerData.required_skills || [],
-          preferred_skills: careerData.preferred_skills || [],
-          estimated_time: "6-12 months",
-          difficulty: "Intermediate to Advanced"
-        });
+      const data = await getCareerBootstrap(id);
+      if (isCancelled()) {
+        return;
+      }
+      console.log('Career data:', data);
+      setCareer(data.career);
+      setRoadmap(data.roadmap);
+      roadmapJobId = data.roadmap_job_id;
+    } catch (error) {
+      if (isCancelled()) {
+        return;
+      }
+      console.error('Error loading career details:', error);
+      alert(`Error loading career: ${error.message || 'Unknown error'}`);
+    } finally {
+      if (!isCancelled()) {
+        setLoading(false);
       }
+    }
 
-      // Then, try to fetch the enhanced roadmap from the API
+    // The base roadmap is shown right away; swap in the AI-enhanced one when its job finishes
+    if (roadmapJobId) {
       try {
-        const roadmapData = await getLearningRoadmap(id);
-        console.log('Roadmap data:', roadmapData);
-        setRoadmap(roadmapData); // This will overwrite the fallback if successful
+        const job = await getJob(roadmapJobId, 25);
+        if (!isCancelled() && job.status === 'completed' && job.result) {
+          console.log('Roadmap data:', job.result);
+          setRoadmap(job.result);
+        }
       } catch (roadmapError) {
         console.error('Could not load enhanced roadmap, using default.', roadmapError);
       }
-
-    } catch (error) {
-      console.error('Error loading career details:', error);
-      alert(`Error loading career: ${error.message || 'Unknown error'}`);
-    } finally {
-      setLoading(false);
     }
   };
 
@@ -33,6 +33,68 @@ export const getCareerById = async (id) => {
   }
 };
 
+const CATALOG_SUMMARY_KEY = 'careerCatalogSummary';
+
+const readCachedSummary = () => {
+  try {
+    return JSON.parse(localStorage.getItem(CATALOG_SUMMARY_KEY));
+  } catch (error) {
+    return null;
+  }
+};
+
+// Card-sized career list, cached in localStorage and only re-downloaded when the catalog version changes
+export const getCatalogSummary = async () => {
+  const cached = readCachedSummary();
+  try {
+    const response = await api.get('/careers/summary', {
+      params: cached?.version ? { version: cached.version } : {},
+    });
+    if (!response.data.changed && cached?.careers) {
+      return cached.careers;
+    }
+    try {
+      localStorage.setItem(
+        CATALOG_SUMMARY_KEY,
+        JSON.stringify({ version: response.data.version, careers: response.data.careers })
+      );
+    } catch (storageError) {
+      console.warn('Could not cache career catalog:', storageError);
+    }
+    return response.data.careers;
+  } catch (error) {
+    console.error('Error fetching career catalog:', error);
+    if (cached?.careers) {
+      return cached.careers;
+    }
+    if (error.code === 'ECONNREFUSED' || error.message.includes('Network Error')) {
+      throw new Error('Backend server is not running. Please start it on port 8000.');
+    }
+    throw error;
+  }
+};
+
+// Career, roadmap and related careers in a single request
+export const getCareerBootstrap = async (id) => {
+  try {
+    const response = await api.get(`/careers/${id}/bootstrap`);
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching career:', error);
+    throw error;
+  }
+};
+
+export const getJob = async (jobId, wait = 0) => {
+  try {
+    const response = await api.get(`/jobs/${jobId}`, { params: { wait } });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching job:', error);
+    throw error;
+  }
+};
+
 export const searchCareers = async (query) => {
   try {
     const response = await api.get('/careers/search', { params: { q: query } });